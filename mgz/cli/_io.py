@@ -0,0 +1,173 @@
+"""Input helpers shared by the command-line tools.
+
+Every tool accepts either a raw replay or a ZIP archive containing one.
+Files with a replay extension are taken as raw replays; anything else is
+checked for the leading ZIP magic bytes.
+
+If python-isal or zlib-ng is installed, it is used both for deflated ZIP
+members, which are inflated here rather than through zipfile, and for the
+replay header itself (see mgz.util.raw_inflate).
+"""
+
+import io
+import mmap
+import os
+import struct
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from mgz.util import fast_zlib
+
+# Local file header, or end of central directory for an empty archive
+ZIP_MAGIC = (b'PK\x03\x04', b'PK\x05\x06')
+READ_CHUNK_SIZE = 1 << 20
+# Fixed part of a local file header; the name and extra field follow it
+LOCAL_HEADER_SIZE = 30
+LOCAL_HEADER_LENGTHS = struct.Struct('<26xHH')
+# Extensions of replay files, matched case-insensitively
+_SUFFIXES = ('.mgz', '.aoe2record')
+
+
+def _existing(path):
+    if not isinstance(path, Path):
+        path = Path(path)
+    if not path.exists():
+        print(f"Error: file not found: {path}", file=sys.stderr)
+        sys.exit(1)
+    return path
+
+
+def _is_zip(path, handle):
+    """Return whether `handle` holds a ZIP archive, leaving it at offset 0."""
+    if path.suffix.lower() in _SUFFIXES:
+        return False
+    magic = handle.read(4)
+    handle.seek(0)
+    return magic in ZIP_MAGIC
+
+
+def zip_member(zf):
+    """Return the name of the replay inside a ZIP archive."""
+    names = zf.namelist()
+    mgz_names = [n for n in names if n.lower().endswith(_SUFFIXES)]
+    if not mgz_names:
+        # Fall back to first entry if none has a replay extension
+        mgz_names = names[:1]
+    if not mgz_names:
+        print("Error: ZIP archive is empty", file=sys.stderr)
+        sys.exit(1)
+    if len(mgz_names) > 1:
+        print(f"Warning: multiple candidates in ZIP, using '{mgz_names[0]}'", file=sys.stderr)
+    return mgz_names[0]
+
+
+def _member_offset(handle, info):
+    """Return the offset of a ZIP member's data, past its local file header."""
+    handle.seek(info.header_offset)
+    header = handle.read(LOCAL_HEADER_SIZE)
+    if len(header) < LOCAL_HEADER_SIZE or header[:4] != ZIP_MAGIC[0]:
+        raise zipfile.BadZipFile(f"Bad magic number for file header of {info.filename!r}")
+    name_length, extra_length = LOCAL_HEADER_LENGTHS.unpack(header)
+    return info.header_offset + LOCAL_HEADER_SIZE + name_length + extra_length
+
+
+def _inflate_member(handle, info, view):
+    """Fill `view` with a stored or deflated ZIP member, checking its CRC.
+
+    The member is read straight from the archive and inflated with
+    mgz.util.fast_zlib, so zipfile's own (stdlib) decompressor is bypassed.
+    """
+    handle.seek(_member_offset(handle, info))
+    inflater = fast_zlib.decompressobj(-15) if info.compress_type == zipfile.ZIP_DEFLATED else None
+    remaining = info.compress_size
+    pos = crc = 0
+    while remaining > 0:
+        chunk = handle.read(min(READ_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        if inflater is not None:
+            chunk = inflater.decompress(chunk)
+        end = pos + len(chunk)
+        if end > len(view):
+            break
+        view[pos:end] = chunk
+        crc = fast_zlib.crc32(chunk, crc)
+        pos = end
+    if pos != len(view) or remaining or crc != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+
+
+def _read_member(zf, handle, name):
+    """Read a ZIP member into an anonymous mmap of its uncompressed size.
+
+    Filling a preallocated buffer avoids the intermediate copies made by
+    ZipFile.read, and the result works as a file object. Members that are
+    encrypted or use another compression method are read through zipfile.
+    """
+    info = zf.getinfo(name)
+    if not info.file_size:
+        return b''
+    buf = mmap.mmap(-1, info.file_size)
+    encrypted = info.flag_bits & 0x1
+    with memoryview(buf) as view:
+        if info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) and not encrypted:
+            _inflate_member(handle, info, view)
+            return buf
+        with zf.open(info) as member:
+            pos = 0
+            while pos < info.file_size:
+                count = member.readinto(view[pos:pos + READ_CHUNK_SIZE])
+                if not count:
+                    break
+                pos += count
+    return buf
+
+
+def open_mgz(path):
+    """Return contents of the MGZ file, unpacking a ZIP if necessary.
+
+    The result is an mmap, which also works as a file object: read-only
+    and file-backed for plain files, anonymous for ZIP members.
+    """
+    path = _existing(path)
+    with path.open('rb') as handle:
+        if not _is_zip(path, handle):
+            try:
+                return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return b''
+        with zipfile.ZipFile(handle) as zf:
+            return _read_member(zf, handle, zip_member(zf))
+
+
+def open_mgz_stream(path):
+    """Return (stream, size) of the MGZ file, unpacking a ZIP if necessary.
+
+    Plain files are returned as an open binary file, which lets callers
+    use its descriptor directly (e.g. os.sendfile). ZIP members are
+    unpacked into an anonymous mmap, as open_mgz() does.
+    """
+    path = _existing(path)
+    handle = path.open('rb')
+    if not _is_zip(path, handle):
+        return handle, os.fstat(handle.fileno()).st_size
+    with handle, zipfile.ZipFile(handle) as zf:
+        member = _read_member(zf, handle, zip_member(zf))
+    return (member if member else io.BytesIO()), len(member)
+
+
+def map_inputs(paths, fn):
+    """Yield fn(path) for each input path, in order.
+
+    A single input is processed inline. Several go through a thread pool:
+    zlib releases the GIL while inflating, so they decompress in parallel.
+    """
+    if len(paths) == 1:
+        yield fn(paths[0])
+        return
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        yield from executor.map(fn, paths)
@@ -0,0 +1,61 @@
+"""JSON encoding shared by the command-line tools.
+
+Output is encoded with orjson when it is installed (compact or an indent
+of 2), and with the standard library json module otherwise.
+"""
+
+import json
+from enum import Enum
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _enum_name(obj):
+    return obj.name
+
+
+def make_default(converters=None):
+    """Return a `default` hook for objects JSON can't encode natively.
+
+    Bytes are written as hex and Enums by name; `converters` maps further
+    exact types to their converter.
+    """
+    # Exact type -> converter; Enum subclasses are added as they are encountered
+    dispatch = {
+        bytes: bytes.hex,
+        bytearray: bytearray.hex,
+    }
+    dispatch.update(converters or {})
+
+    def default(obj):
+        handler = dispatch.get(type(obj))
+        if handler is not None:
+            return handler(obj)
+        if isinstance(obj, Enum):
+            dispatch[type(obj)] = _enum_name
+            return obj.name
+        if isinstance(obj, bytes):
+            return obj.hex()
+        raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+    return default
+
+
+def make_dumps(default, indent=None, **options):
+    """Return a function encoding one object to UTF-8 JSON bytes.
+
+    orjson serializes Enums by value without consulting `default`, so
+    callers must convert them to names first. It only supports an indent
+    of 2; other widths, and the stdlib fallback, use a json.JSONEncoder
+    built once with `options`.
+    """
+    if orjson is not None and indent in (None, 2):
+        # orjson is a compiled extension that pylint can't inspect
+        # pylint: disable=no-member
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return lambda obj: orjson.dumps(obj, default=default, option=option)
+    encoder = json.JSONEncoder(default=default, indent=indent, **options)
+    return lambda obj: encoder.encode(obj).encode('utf-8')
@@ -4,71 +4,70 @@
 The header is automatically decompressed before dumping.
 Input can be a raw .mgz file or a .zip archive containing one.
 
+Several replays can be given at once; they are decompressed in parallel
+and dumped in the order given.
+
 Examples:
     ./dump_mgz.py rec.mgz header --offset 600 --length 256
     ./dump_mgz.py rec.zip  body   --offset 0   --length 128
     ./dump_mgz.py rec.mgz header --offset 0x2e0            # hex offset, default length
+    ./dump_mgz.py a.mgz b.mgz header --length 64           # one dump per file
 """
 
 import argparse
 import io
 import struct
 import sys
-import zipfile
-import zlib
-from pathlib import Path
-
-ZLIB_WBITS = -15
-DEFAULT_LENGTH = 256
 
+from mgz.cli._io import map_inputs, open_mgz
+from mgz.util import HEX_BYTES, INFLATE_ERRORS, PRINTABLE, raw_inflate
 
-def load_mgz_bytes(path):
-    path = Path(path)
-    if not path.exists():
-        print(f"Error: file not found: {path}", file=sys.stderr)
-        sys.exit(1)
-    if zipfile.is_zipfile(path):
-        with zipfile.ZipFile(path) as zf:
-            names = zf.namelist()
-            mgz_names = [n for n in names if n.lower().endswith('.mgz') or n.lower().endswith('.aoe2record')]
-            if not mgz_names:
-                mgz_names = names[:1]
-            if not mgz_names:
-                print("Error: ZIP archive is empty", file=sys.stderr)
-                sys.exit(1)
-            if len(mgz_names) > 1:
-                print(f"Warning: multiple candidates in ZIP, using '{mgz_names[0]}'", file=sys.stderr)
-            return zf.read(mgz_names[0])
-    return path.read_bytes()
+DEFAULT_LENGTH = 256
+_ROW_FORMAT = b'  %08x  %-47b  %b\n'
+_LABEL_FORMAT = b'[%b] offset=0x%x (%d) length=0x%x (%d) total=0x%x (%d)\n'
+_U4 = struct.Struct('<I').unpack_from
+_U4_PAIR = struct.Struct('<II').unpack_from
 
 
 def get_header(raw):
-    """Return decompressed header bytes."""
+    """Return decompressed header bytes.
+
+    The compressed region is passed to the inflater as a memoryview, so it
+    is read straight from the mapping without an intermediate copy.
+    """
     if len(raw) < 8:
         print("Error: file too small", file=sys.stderr)
         sys.exit(1)
-    header_length, chapter_address = struct.unpack('<II', raw[:8])
-    compressed = raw[8:header_length]
+    header_length, chapter_address = _U4_PAIR(raw, 0)
+    compressed = memoryview(raw)[8:header_length]
     try:
-        return zlib.decompress(compressed, wbits=ZLIB_WBITS)
-    except zlib.error as e:
+        return raw_inflate(compressed)
+    except INFLATE_ERRORS as e:
         print(f"Error: failed to decompress header: {e}", file=sys.stderr)
         sys.exit(1)
 
 
 def get_body(raw):
-    """Return body bytes."""
-    header_length, = struct.unpack('<I', raw[:4])
-    return raw[header_length:]
+    """Return the body as a zero-copy memoryview of `raw`."""
+    header_length, = _U4(raw, 0)
+    return memoryview(raw)[header_length:]
 
 
-def hexdump(data, base_offset=0):
+def hexdump_to(data, out, base_offset=0):
+    """Write a hex dump of the bytes-like `data` to the binary stream `out`."""
+    data = bytes(data)
+    rows = bytearray()
     for i in range(0, len(data), 16):
         chunk = data[i:i+16]
-        offset = base_offset + i
-        hex_part = ' '.join(f'{b:02x}' for b in chunk)
-        asc_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-        print(f"  {offset:08x}  {hex_part:<47}  {asc_part}")
+        hex_part = b' '.join(map(HEX_BYTES.__getitem__, chunk))
+        rows += _ROW_FORMAT % (base_offset + i, hex_part, chunk.translate(PRINTABLE))
+    out.write(rows)
+
+
+def hexdump(data, base_offset=0):
+    # Rows bypass the text layer, so anything print()ed before must go out first
+    sys.stdout.flush()
+    hexdump_to(data, sys.stdout.buffer, base_offset)
 
 
 def auto_int(x):
@@ -76,20 +75,9 @@ def auto_int(x):
     return int(x, 0)
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Hex-dump byte ranges from an MGZ replay header (decompressed) or body.'
-    )
-    parser.add_argument('rec_path', help='Path to .mgz file or .zip archive')
-    parser.add_argument('section', choices=['header', 'body'],
-                        help='Which section to dump')
-    parser.add_argument('--offset', '-s', type=auto_int, default=0,
-                        help='Start offset in bytes (decimal or 0x hex, default: 0)')
-    parser.add_argument('--length', '-n', type=auto_int, default=DEFAULT_LENGTH,
-                        help=f'Number of bytes to dump (default: {DEFAULT_LENGTH})')
-    args = parser.parse_args()
-
-    raw = load_mgz_bytes(args.rec_path)
+def _process_one(rec_path, args):
+    """Return the rendered dump of one replay as bytes."""
+    raw = open_mgz(rec_path)
 
     if args.section == 'header':
         data = get_header(raw)
@@ -110,8 +98,31 @@ def main():
         length = total - offset
         print(f"Note: clamped to {length} bytes (section ends at 0x{total:x})", file=sys.stderr)
 
-    print(f"[{label}] offset=0x{offset:x} ({offset}) length=0x{length:x} ({length}) total=0x{total:x} ({total})")
-    hexdump(data[offset:offset + length], base_offset=offset)
+    out = io.BytesIO()
+    out.write(_LABEL_FORMAT % (label.encode(), offset, offset, length, length, total, total))
+    hexdump_to(data[offset:offset + length], out, base_offset=offset)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Hex-dump byte ranges from an MGZ replay header (decompressed) or body.'
+    )
+    parser.add_argument('rec_path', nargs='+',
+                        help='Path to .mgz file or .zip archive (one or more)')
+    parser.add_argument('section', choices=['header', 'body'],
+                        help='Which section to dump')
+    parser.add_argument('--offset', '-s', type=auto_int, default=0,
+                        help='Start offset in bytes (decimal or 0x hex, default: 0)')
+    parser.add_argument('--length', '-n', type=auto_int, default=DEFAULT_LENGTH,
+                        help=f'Number of bytes to dump (default: {DEFAULT_LENGTH})')
+    args = parser.parse_args()
+
+    dumps = map_inputs(args.rec_path, lambda path: _process_one(path, args))
+    for rec_path, dump in zip(args.rec_path, dumps):
+        if len(args.rec_path) > 1:
+            sys.stdout.buffer.write(f"==> {rec_path} <==\n".encode())
+        sys.stdout.buffer.write(dump)
 
 
 if __name__ == '__main__':
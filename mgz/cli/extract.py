@@ -4,92 +4,116 @@
 The input can be an .mgz file directly or a .zip archive containing one.
 The header is stored zlib-compressed (no zlib framing, wbits=-15) in the MGZ
 and will always be decompressed on output.
+
+Several replays can be given at once; they are extracted in parallel, each
+next to its input.
 """
 
 import argparse
 import io
+import os
+import shutil
 import struct
 import sys
-import zipfile
-import zlib
 from pathlib import Path
 
+from mgz.cli._io import map_inputs, open_mgz_stream
+from mgz.util import INFLATE_ERRORS, fast_zlib
 
-def load_mgz_bytes(rec_path):
-    """Return raw bytes of the MGZ file, unpacking a ZIP if necessary."""
-    path = Path(rec_path)
-    if not path.exists():
-        print(f"Error: file not found: {path}", file=sys.stderr)
-        sys.exit(1)
-
-    if zipfile.is_zipfile(path):
-        with zipfile.ZipFile(path) as zf:
-            names = zf.namelist()
-            mgz_names = [n for n in names if n.lower().endswith('.mgz')]
-            if not mgz_names:
-                # Fall back to first entry if none has .mgz extension
-                mgz_names = names[:1]
-            if not mgz_names:
-                print("Error: ZIP archive is empty", file=sys.stderr)
-                sys.exit(1)
-            if len(mgz_names) > 1:
-                print(
-                    f"Warning: multiple candidates in ZIP, using '{mgz_names[0]}'",
-                    file=sys.stderr,
-                )
-            return zf.read(mgz_names[0])
+CHUNK_SIZE = 1 << 16
+OUTPUT_BUFFER_SIZE = 1 << 20
+SENDFILE_CHUNK_SIZE = 1 << 24
+_P4 = struct.Struct('<I').pack
+_U4 = struct.Struct('<I').unpack_from
 
-    return path.read_bytes()
 
+def split_header(stream, size):
+    """Read the MGZ prefix and return (header_length, chapter_address_bytes, compressed_length).
 
-def split_header(raw):
-    """Return (header_length, chapter_address_bytes, compressed_data, body_data).
-
-    header_length       – value of the first 4 bytes
+    header_length         – value of the first 4 bytes
     chapter_address_bytes – 4 bytes if present, else b''
-    compressed_data     – the raw zlib stream
-    body_data           – everything after the header section
+    compressed_length     – size of the raw zlib stream that follows
+
+    The stream is left positioned at the start of the zlib stream.
     """
-    if len(raw) < 4:
+    prefix = stream.read(8)
+    if len(prefix) < 4:
         print("Error: file too small to be a valid MGZ replay", file=sys.stderr)
         sys.exit(1)
 
-    header_length, = struct.unpack('<I', raw[:4])
-    if header_length > len(raw):
+    header_length, = _U4(prefix, 0)
+    if header_length > size:
         print(
-            f"Error: header_length ({header_length}) exceeds file size ({len(raw)})",
+            f"Error: header_length ({header_length}) exceeds file size ({size})",
             file=sys.stderr,
         )
         sys.exit(1)
 
     # Peek at the next 4 bytes to decide whether chapter_address is present
-    check, = struct.unpack('<I', raw[4:8])
+    check, = _U4(prefix, 4)
     if check < 100_000_000:
-        chapter_address_bytes = raw[4:8]
-        compressed_data = raw[8:header_length]
+        chapter_address_bytes = prefix[4:8]
     else:
         chapter_address_bytes = b''
-        compressed_data = raw[4:header_length]
+        stream.seek(4)
 
-    body_data = raw[header_length:]
-    return header_length, chapter_address_bytes, compressed_data, body_data
+    compressed_length = header_length - 4 - len(chapter_address_bytes)
+    return header_length, chapter_address_bytes, compressed_length
 
 
-def decompress_header_data(compressed_data):
-    """Decompress the zlib stream (no zlib framing, wbits=-15)."""
-    try:
-        return zlib.decompress(compressed_data, wbits=-15)
-    except zlib.error as exc:
-        print(f"Error: failed to decompress header: {exc}", file=sys.stderr)
-        sys.exit(1)
+def decompress_header_data(stream, length, out):
+    """Inflate `length` bytes of zlib stream (no zlib framing, wbits=-15) into `out`.
+
+    The stream is fed through in CHUNK_SIZE pieces, so neither the compressed
+    nor the decompressed header is held in memory. Returns the number of
+    decompressed bytes written.
+    """
+    inflater = fast_zlib.decompressobj(-15)
+    written = 0
+    while length > 0:
+        chunk = stream.read(min(CHUNK_SIZE, length))
+        if not chunk:
+            break
+        length -= len(chunk)
+        written += out.write(inflater.decompress(chunk))
+    written += out.write(inflater.flush())
+    if not inflater.eof:
+        raise fast_zlib.error("incomplete or truncated stream")
+    return written
+
+
+def copy_body(stream, offset, count, out):
+    """Copy `count` bytes of `stream`, starting at `offset`, into `out`.
+
+    Plain files are copied in-kernel with os.sendfile, so the body never
+    passes through user space. ZIP members, and platforms where sendfile
+    cannot target a regular file, fall back to a chunked copy.
+    """
+    if hasattr(os, 'sendfile') and isinstance(stream, io.BufferedReader):
+        out.flush()
+        out_fd, in_fd = out.fileno(), stream.fileno()
+        try:
+            while count > 0:
+                sent = os.sendfile(out_fd, in_fd, offset, min(count, SENDFILE_CHUNK_SIZE))
+                if not sent:
+                    break
+                offset += sent
+                count -= sent
+            return
+        except OSError:
+            # e.g. macOS only sends to sockets; continue with a plain copy
+            pass
+    stream.seek(offset)
+    shutil.copyfileobj(stream, out, CHUNK_SIZE)
 
 
 def extract(rec_path, header_path=None, body_path=None):
-    raw = load_mgz_bytes(rec_path)
+    rec_path = Path(rec_path)
+    stream, size = open_mgz_stream(rec_path)
 
     # Derive default output names from the input stem
-    stem = Path(rec_path).stem  # strips .zip or .mgz
-    base_dir = Path(rec_path).parent
+    stem = rec_path.stem  # strips .zip or .mgz
+    base_dir = rec_path.parent
 
     if header_path is None:
         header_path = base_dir / (stem + '.header.bin')
@@ -101,38 +125,55 @@ def extract(rec_path, header_path=None, body_path=None):
     else:
         body_path = Path(body_path)
 
-    header_length, chapter_address_bytes, compressed_data, body_data = split_header(raw)
-
-    decompressed = decompress_header_data(compressed_data)
-    # Reassemble: keep the 4-byte length field and optional chapter_address,
-    # then append the decompressed content.
-    header_out = raw[:4] + chapter_address_bytes + decompressed
+    with stream:
+        header_length, chapter_address_bytes, compressed_length = split_header(stream, size)
+
+        # Reassemble: keep the 4-byte length field and optional chapter_address,
+        # then append the decompressed content.
+        with header_path.open('wb', buffering=OUTPUT_BUFFER_SIZE) as out:
+            header_size = out.write(_P4(header_length))
+            header_size += out.write(chapter_address_bytes)
+            try:
+                header_size += decompress_header_data(stream, compressed_length, out)
+            except INFLATE_ERRORS as exc:
+                out.close()
+                header_path.unlink()
+                print(f"Error: failed to decompress header: {exc}", file=sys.stderr)
+                sys.exit(1)
 
-    header_path.write_bytes(header_out)
-    body_path.write_bytes(body_data)
+        with body_path.open('wb') as out:
+            copy_body(stream, header_length, size - header_length, out)
+        body_size = size - header_length
 
-    print(f"Header ({len(header_out)} bytes) -> {header_path}")
-    print(f"Body   ({len(body_data)} bytes)  -> {body_path}")
+    # One write, so summaries from parallel extractions don't interleave
+    sys.stdout.write(
+        f"Header ({header_size} bytes) -> {header_path}\n"
+        f"Body   ({body_size} bytes)  -> {body_path}\n"
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Extract header and body from an MGZ replay file (or a ZIP containing one).'
+        description='Extract header and body from MGZ replay files (or ZIPs containing one).'
     )
     parser.add_argument(
-        'rec_path',
-        help='Path to the .mgz replay file or a .zip archive containing one',
+        'rec_path', nargs='+',
+        help='Path to the .mgz replay file or a .zip archive containing one (one or more)',
     )
     parser.add_argument(
         '--header', metavar='PATH',
-        help='Output path for the header (default: <name>.mgz-header)',
+        help='Output path for the header (default: <name>.header.bin; single input only)',
     )
     parser.add_argument(
         '--body', metavar='PATH',
-        help='Output path for the body (default: <name>.mgz-body)',
+        help='Output path for the body (default: <name>.body.bin; single input only)',
     )
     args = parser.parse_args()
-    extract(args.rec_path, args.header, args.body)
+
+    if len(args.rec_path) > 1 and (args.header or args.body):
+        parser.error('--header/--body can only be used with a single input')
+    for _ in map_inputs(args.rec_path, lambda path: extract(path, args.header, args.body)):
+        pass
 
 
 if __name__ == '__main__':
@@ -3,25 +3,84 @@
 
 Input: an extracted .body.bin file (as produced by extract_mgz.py).
 Output: one JSON object per operation, written to stdout (JSON Lines format).
+
+Records are encoded with orjson when it is installed (compact or --indent 2),
+and with the standard library json module otherwise.
 """
 
 import argparse
 import io
-import json
+import mmap
+import queue
 import sys
+import threading
 from enum import Enum
 from pathlib import Path
 
 from mgz import fast
+from mgz.cli._json import make_default, make_dumps
+
+WRITE_BATCH_SIZE = 1024
+WRITE_QUEUE_DEPTH = 8
+
+
+def _make_dumps(indent):
+    """Return a function encoding one record to UTF-8 JSON bytes."""
+    # Compact separators unless pretty-printing
+    separators = (',', ': ') if indent else (',', ':')
+    return make_dumps(make_default(), indent, ensure_ascii=False, separators=separators)
 
 
-class _Encoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Enum):
-            return obj.name
-        if isinstance(obj, bytes):
-            return obj.hex()
-        return super().default(obj)
+def _write_batches(out, batches, errors):
+    """Write encoded batches to `out` until the None sentinel arrives.
+
+    Any failure, including one from the final flush, is appended to
+    `errors` for main() to raise. The remaining batches are then drained
+    and dropped, so the producer never blocks on a full queue.
+    """
+    # pylint: disable=broad-exception-caught
+    for batch in iter(batches.get, None):
+        if errors:
+            continue
+        try:
+            out.write(batch)
+        except BaseException as e:
+            errors.append(e)
+    if errors:
+        return
+    try:
+        out.flush()
+    except BaseException as e:
+        errors.append(e)
+
+
+def _encode_records(data, dumps, batches, errors):
+    """Queue every remaining operation in `data`, WRITE_BATCH_SIZE records at a time.
+
+    Stops early once the writer thread has reported an error.
+    """
+    lines = []
+    try:
+        while True:
+            try:
+                op_type, payload = fast.operation(data)
+            except EOFError:
+                break
+            record = {'op': op_type.name if isinstance(op_type, Enum) else str(op_type)}
+            if op_type is fast.Operation.ACTION:
+                action_type, action = payload
+                payload = (action_type.name, action)
+            if payload is not None:
+                record['payload'] = payload
+            lines.append(dumps(record))
+            if len(lines) == WRITE_BATCH_SIZE:
+                batches.put(b'\n'.join(lines) + b'\n')
+                lines = []
+                if errors:
+                    break
+    finally:
+        if lines:
+            batches.put(b'\n'.join(lines) + b'\n')
 
 
 def main():
@@ -37,24 +96,37 @@ def main():
         print(f"Error: file not found: {path}", file=sys.stderr)
         sys.exit(1)
 
-    data = io.BytesIO(path.read_bytes())
+    with path.open('rb') as handle:
+        try:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            data = io.BytesIO()
     indent = args.indent if args.indent and args.indent > 0 else None
 
-    try:
-        fast.meta(data)
-    except ValueError as e:
-        print(f"Error reading body meta: {e}", file=sys.stderr)
-        sys.exit(1)
+    with data:
+        try:
+            fast.meta(data)
+        except ValueError as e:
+            print(f"Error reading body meta: {e}", file=sys.stderr)
+            sys.exit(1)
 
-    while True:
+        # Encoding stays here (it needs the GIL anyway); a writer thread takes
+        # the blocking stdout writes, WRITE_BATCH_SIZE records at a time.
+        sys.stdout.flush()
+        batches = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+        errors = []
+        writer = threading.Thread(
+            target=_write_batches, args=(sys.stdout.buffer, batches, errors), daemon=True
+        )
+        writer.start()
         try:
-            op_type, payload = fast.operation(data)
-        except EOFError:
-            break
-        record = {'op': op_type.name if isinstance(op_type, Enum) else str(op_type)}
-        if payload is not None:
-            record['payload'] = payload
-        print(json.dumps(record, cls=_Encoder, indent=indent))
+            _encode_records(data, _make_dumps(indent), batches, errors)
+        finally:
+            batches.put(None)
+            writer.join()
+        if errors:
+            raise errors[0]
 
 
 if __name__ == '__main__':
@@ -4,49 +4,27 @@
 Input: a raw .mgz file or a .zip archive containing one.
 Output: parsed header data as JSON, written to -o file (or stdout if given).
         Without -o the parse is still attempted; useful with --debug.
+
+JSON is encoded with orjson when it is installed (compact or --indent 2),
+and with the standard library json module otherwise.
 """
 
 import argparse
+import hashlib
 import io
-import json
 import logging
+import mmap
 import sys
-import zipfile
 from enum import Enum
 from pathlib import Path
 
+from mgz.cli._io import open_mgz
+from mgz.cli._json import make_default, make_dumps
 from mgz.fast import header as fast_header
 
 
-class _Encoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Enum):
-            return obj.name
-        if isinstance(obj, bytes):
-            return obj.hex()
-        if hasattr(obj, 'hexdigest') and callable(obj.hexdigest):
-            return obj.hexdigest()
-        return super().default(obj)
-
-
-def load_mgz_bytes(path):
-    path = Path(path)
-    if not path.exists():
-        print(f"Error: file not found: {path}", file=sys.stderr)
-        sys.exit(1)
-    if zipfile.is_zipfile(path):
-        with zipfile.ZipFile(path) as zf:
-            names = zf.namelist()
-            mgz_names = [n for n in names if n.lower().endswith('.mgz')]
-            if not mgz_names:
-                mgz_names = names[:1]
-            if not mgz_names:
-                print("Error: ZIP archive is empty", file=sys.stderr)
-                sys.exit(1)
-            if len(mgz_names) > 1:
-                print(f"Warning: multiple candidates in ZIP, using '{mgz_names[0]}'", file=sys.stderr)
-            return zf.read(mgz_names[0])
-    return path.read_bytes()
+# The DE header carries its guid hash as a hashlib object
+_default = make_default({type(hashlib.sha1()): lambda obj: obj.hexdigest()})
 
 
 def main():
@@ -71,19 +49,24 @@ def main():
     else:
         logging.basicConfig(level=logging.WARNING)
 
-    raw = load_mgz_bytes(args.rec_path)
-    data = io.BytesIO(raw)
+    raw = open_mgz(args.rec_path)
+    data = raw if isinstance(raw, mmap.mmap) else io.BytesIO(raw)
 
     try:
         result = fast_header.parse(data)
     except RuntimeError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        data.close()
 
     if args.output:
         indent = args.indent if args.indent > 0 else None
         out = Path(args.output)
-        out.write_text(json.dumps(result, cls=_Encoder, indent=indent))
+        # orjson would write the version Enum by value
+        if isinstance(result.get('version'), Enum):
+            result = dict(result, version=result['version'].name)
+        out.write_bytes(make_dumps(_default, indent)(result))
         print(f"Written to {out}", file=sys.stderr)
 
 
@@ -2,121 +2,173 @@
 import io
 import hashlib
 import logging
+import os
 import re
 import struct
-import uuid
-import zlib
+from contextlib import closing
+from itertools import islice
+from operator import ge, gt
 
-from mgz.util import get_version, unpack, Version, as_hex
+from mgz.util import INFLATE_ERRORS, get_version, raw_inflate, unpack, Version, as_hex
+from mgz.util import bounded_map, find_ahead, find_wildcard, hexdump, read_exact, skip_bytes
 
 LOGGER = logging.getLogger(__name__)
-ZLIB_WBITS = -15
 HEXDUMP_CONTEXT = 500
 
+# Precompiled fixed formats, so hot reads don't go through the format cache
+UINT32 = struct.Struct('<I')
+INT32 = struct.Struct('<i')
+INT16 = struct.Struct('<h')
+INT8 = struct.Struct('<b')
+FLOAT32 = struct.Struct('<f')
+UINT32_PAIR = struct.Struct('<II')
+POINTS_BLOCK = struct.Struct('<fi')
+DE_STRING_LENGTH = struct.Struct('<2xh')
+PLAYER_START = struct.Struct('<xff9xb3xbx')
+OBJECT = struct.Struct('<bxH14xIxff')
+# Runs of adjacent per-player DE/HD fields, each read and unpacked in one call
+HD_PLAYER = struct.Struct('<4xi12xI')
+HD_PLAYER_ID = struct.Struct('<4xQi8x')
+DE_PLAYER = struct.Struct('<4xi2xb9xI')
+DE_PLAYER_ID = struct.Struct('<II4xi')
+# Map tile formats: AOC/HD, DE before save 62.0, and DE from 62.0
+TILE = struct.Struct('<xbbx')
+TILE_DE = struct.Struct('<bxb6x')
+TILE_DE62 = struct.Struct('<bxxb6x')
+
+# Version-gated padding in parse_de, as (comparison, save version, bytes)
+_DE_FLAGS_PADDING = ((ge, 25.06, 1), (gt, 50, 1))
+_DE_PLAYER_PADDING = ((ge, 25.06, 8), (ge, 64.3, 4))
+_DE_MOD_PADDING = (
+    (ge, 20.06, 1), (ge, 20.16, 8), (ge, 25.06, 21), (ge, 25.22, 4), (ge, 26.16, 8),
+    (ge, 37, 3), (gt, 50, 8), (ge, 61.5, 1), (ge, 63, 5)
+)
 
-def _hexdump(data, base_offset=0, mark=None):
-    """Return a hex dump string, optionally marking a specific offset with >>."""
-    lines = []
-    for i in range(0, len(data), 16):
-        chunk = data[i:i+16]
-        offset = base_offset + i
-        marker = '>>' if mark is not None and offset <= mark < offset + 16 else '  '
-        hex_part = ' '.join(f'{b:02x}' for b in chunk)
-        asc_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-        lines.append(f"{marker} {offset:08x}  {hex_part:<47}  {asc_part}")
-    return '\n'.join(lines)
 PLAYER_END = b'\xff\xff\xff\xff\xff\xff\xff\xff.\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0b'
+# Fixed halves around the one wildcard byte of PLAYER_END and the object start marker
+PLAYER_END_PREFIX, PLAYER_END_SUFFIX = PLAYER_END[:8], PLAYER_END[9:]
+OBJECT_START_PREFIX, OBJECT_START_SUFFIX = b'\x0b\x00', b'\x00\x00\x00\x02\x00\x00'
 CLASSES = [b'\x0a', b'\x1e', b'\x46', b'\x50', b'\x14']
 BLOCK_END = b'\x00\x0b'
+DE_STRING_MAGIC = b'\x60\x0a'
+AI_END = b'\x00' * 4096
+# Gaia's player name, as spelled by DE and HD and by older versions
+GAIA_DE = b'\x05\x00Gaia\x00'
+GAIA_UP = b'\x05\x00GAIA\x00'
+# Start of the points blocks: a float version, 2.0 before save 61.5 and 2.1 since
+POINTS_VERSION = b'\x00\x00\x00@'
+POINTS_VERSION_61_5 = b'\x66\x66\x06\x40'
 REGEXES = {}
 SKIP_OBJECTS = [
     (b'\x1e\x00\x87\x02', 252)  # 647: junk DE object, thousands per file
 ]
+SKIP_FINGERPRINTS = frozenset(fingerprint for fingerprint, _ in SKIP_OBJECTS)
 
 
 def _compile_object_search():
     """Compile regular expressions for object searching."""
-    class_or = b'(' + b'|'.join(CLASSES) + b')'
+    class_or = b'(?:' + b'|'.join(CLASSES) + b')'
     for i in range(9):
-        expr = class_or + struct.pack('b', i) + b'(?!\xff\xff)(?!\x00\x00)[\x00-\xff]{4}\xff\xff\xff\xff[^\xff]'
-        REGEXES[i] = re.compile(expr)
+        expr = class_or + struct.pack('b', i) + b'(?!\xff\xff)(?!\x00\x00).{4}\xff\xff\xff\xff[^\xff]'
+        REGEXES[i] = re.compile(expr, re.DOTALL)
 
 
 _compile_object_search()
+# Bound search methods, indexed by player number
+OBJECT_SEARCHES = tuple(REGEXES[i].search for i in range(9))
 
 
 def aoc_string(data):
     """Read AOC string."""
-    length = unpack('<h', data)
+    length = INT16.unpack(data.read(2))[0]
     return data.read(length)
 
 
 def int_prefixed_string(data):
     """Read length prefixed (4 byte) string."""
-    length = unpack('<I', data)
+    length = UINT32.unpack(data.read(4))[0]
     return data.read(length)
 
 
+def skip_int_prefixed_string(data):
+    """Skip length prefixed (4 byte) string."""
+    data.seek(UINT32.unpack(data.read(4))[0], 1)
+
+
+def _padding(save, base, table):
+    """Return `base` plus the size of every table entry present in `save`."""
+    return base + sum(size for compare, version, size in table if compare(save, version))
+
+
 def de_string(data):
     """Read DE string."""
-    pos = data.tell()
-    got = data.read(2)
-    if got != b'\x60\x0a':
-        raise ValueError(f"de_string magic mismatch at pos {pos}: expected 60 0a, got {got.hex()!r}")
-    length = unpack('<h', data)
-    return unpack(f'<{length}s', data)
+    # Magic and length come in one read
+    prefix = data.read(4)
+    if not prefix.startswith(DE_STRING_MAGIC):
+        raise ValueError(f"de_string magic mismatch at pos {data.tell() - len(prefix)}: "
+                         f"expected 60 0a, got {prefix[:2].hex()!r}")
+    return read_exact(data, DE_STRING_LENGTH.unpack(prefix)[0])
 
 
 def hd_string(data):
     """Read HD string."""
-    length = unpack('<h', data)
-    pos = data.tell()
-    got = data.read(2)
-    if got != b'\x60\x0a':
-        raise ValueError(f"hd_string magic mismatch at pos {pos}: expected 60 0a, got {got.hex()!r}")
-    return unpack(f'<{length}s', data)
+    prefix = data.read(4)
+    length = INT16.unpack_from(prefix)[0]
+    if prefix[2:] != DE_STRING_MAGIC:
+        raise ValueError(f"hd_string magic mismatch at pos {data.tell() - len(prefix) + 2}: "
+                         f"expected 60 0a, got {prefix[2:].hex()!r}")
+    return read_exact(data, length)
 
 
-def parse_object(data, offset):
+def _format_guid(guid):
+    """Format 16 bytes like str(uuid.UUID(bytes=guid)), without building a UUID."""
+    h = guid.hex()
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+def parse_object(data, offset, index):
     """Parse an object."""
-    class_id, object_id, instance_id, pos_x, pos_y = struct.unpack_from('<bxH14xIxff', data, offset)
-    return dict(
-        class_id=class_id,
-        object_id=object_id,
-        instance_id=instance_id,
-        position=dict(
-            x=pos_x,
-            y=pos_y
-        )
-    )
+    class_id, object_id, instance_id, pos_x, pos_y = OBJECT.unpack_from(data, offset)
+    # Dict displays skip the keyword-argument call that dict() costs per object
+    return {
+        'class_id': class_id,
+        'object_id': object_id,
+        'instance_id': instance_id,
+        'position': {
+            'x': pos_x,
+            'y': pos_y
+        },
+        'index': index
+    }
 
 
 def object_block(data, pos, player_number, index):
     """Parse a block of objects."""
     objects = []
-    offset = None
+    search = OBJECT_SEARCHES[player_number]
+    # Start of the first BLOCK_END at or after the last lookup. Lookups only
+    # move forward, so it is searched for again only once it falls behind,
+    # rather than rescanned from every object.
+    block_end = data.find(BLOCK_END, pos)
     while True:
-        if not offset:
-            match = REGEXES[player_number].search(data, pos, pos + 10000)
-            end = data.find(BLOCK_END, pos) - pos + len(BLOCK_END)
-            if match is None:
-                break
-            offset = match.start() - pos
-            while end + 8 < offset:
-                end += data.find(BLOCK_END, pos + end) - (pos + end) + len(BLOCK_END)
-        if end + 8 == offset:
+        match = search(data, pos, pos + 10000)
+        if match is None:
+            if block_end < pos:
+                block_end = data.find(BLOCK_END, pos)
+            break
+        start = match.start()
+        # The block is over if a BLOCK_END sits 8 bytes before the next object
+        lookup = max(pos, start - 10)
+        if block_end < lookup:
+            block_end = data.find(BLOCK_END, lookup)
+        if block_end == start - 10:
             break
-        pos += offset
+        pos = start
         # Speed optimization: Skip specified fixed-length objects.
-        test = data[pos:pos + 4]
-        for fingerprint, offset in SKIP_OBJECTS:
-            if test == fingerprint:
-                break
-        else:
-            objects.append(dict(parse_object(data, pos), index=index))
-        offset = None
+        if data[pos:pos + 4] not in SKIP_FINGERPRINTS:
+            objects.append(parse_object(data, pos, index))
         pos += 31
-    return objects, pos + end
+    return objects, block_end + len(BLOCK_END)
 
 
 def parse_mod(header, num_players, version):
@@ -143,28 +195,31 @@ def parse_player(header, player_number, num_players, save):
     resources_len = 8 if save >= 63 else 4
     LOGGER.debug("[parse_player] player=%d name=%s resources=%d resources_len=%d pos=%d",
                  player_number, name, resources, resources_len, header.tell())
-    header.read(resources * resources_len)
-    start_x, start_y, civilization_id, color_id = unpack('<xff9xb3xbx', header)
+    header.seek(resources * resources_len, 1)
+    start_x, start_y, civilization_id, color_id = PLAYER_START.unpack(header.read(24))
     LOGGER.debug("[parse_player] player=%d pos=(%.1f,%.1f) civ=%d color=%d pos=%d",
                  player_number, start_x, start_y, civilization_id, color_id, header.tell())
     offset = header.tell()
-    data = header.read()
+    # Object scanning works on absolute offsets into the whole header, which
+    # getvalue() returns without copying (read() would copy the remainder).
+    data = header.getvalue()
     # Skips thousands of bytes that are not easy to parse.
-    object_start = re.search(b'\x0b\x00.\x00\x00\x00\x02\x00\x00', data, re.DOTALL)
-    if not object_start:
+    start = find_wildcard(data, OBJECT_START_PREFIX, OBJECT_START_SUFFIX, offset)
+    if start < 0:
         raise RuntimeError("could not find object start")
-    start = object_start.end()
-    LOGGER.debug("[parse_player] player=%d object_start at offset+%d", player_number, start)
+    LOGGER.debug("[parse_player] player=%d object_start at offset+%d", player_number, start - offset)
     objects, end = object_block(data, start, player_number, 0)
     sleeping, end = object_block(data, end, player_number, 1)
     doppel, end = object_block(data, end, player_number, 2)
     LOGGER.debug("[parse_player] player=%d objects=%d sleeping=%d doppel=%d end_offset=%d",
-                 player_number, len(objects), len(sleeping), len(doppel), end)
+                 player_number, len(objects), len(sleeping), len(doppel), end - offset)
+    objects.extend(sleeping)
+    objects.extend(doppel)
     if data[end + 8:end + 10] == BLOCK_END:
         end += 10
     if data[end:end + 2] == BLOCK_END:
         end += 2
-    header.seek(offset + end)
+    header.seek(end)
     LOGGER.debug("[parse_player] player=%d after objects pos=%d", player_number, header.tell())
     device = 0
     if save >= 37:
@@ -173,21 +228,23 @@ def parse_player(header, player_number, num_players, save):
         device = data[8]
         LOGGER.debug("[parse_player] player=%d device=%d pos=%d", player_number, device, header.tell())
         # Jump to the end of player data
-        player_end = re.search(PLAYER_END, data, re.DOTALL)
-        if not player_end:
+        player_end = find_wildcard(data, PLAYER_END_PREFIX, PLAYER_END_SUFFIX)
+        if player_end < 0:
             # Normally this is 26 bytes in,
             # But in some cases (probably where object parsing failed),
-            # it can be tens of thousands of bytes. So we have to `read()` everything
-            offset = header.tell()
-            data = header.read()
-            player_end = re.search(PLAYER_END, data, re.DOTALL)
-            if not player_end and player_number < num_players - 1:
+            # it can be tens of thousands of bytes. So we have to search everything
+            offset = 0  # the buffer search below returns an absolute offset
+            player_end = find_wildcard(header.getvalue(), PLAYER_END_PREFIX, PLAYER_END_SUFFIX, header.tell())
+            if player_end < 0 and player_number < num_players - 1:
                 # this issue happens on restored games
                 # only a failure if this is not the last player, since we seek to the next block anyway
                 raise RuntimeError("could not find player end")
+            if player_end < 0:
+                # Leave the stream at the end, where reading everything left it
+                header.seek(0, io.SEEK_END)
             LOGGER.debug("[parse_player] player=%d player_end fallback search (last player or restored)", player_number)
-        if player_end:
-            header.seek(offset + player_end.end())
+        if player_end >= 0:
+            header.seek(offset + player_end)
             LOGGER.debug("[parse_player] player=%d sought to end marker pos=%d", player_number, header.tell())
 
     LOGGER.debug("[parse_player] player=%d done pos=%d", player_number, header.tell())
@@ -198,7 +255,7 @@ def parse_player(header, player_number, num_players, save):
         diplomacy=diplomacy,
         civilization_id=civilization_id,
         color_id=color_id,
-        objects=objects + sleeping + doppel,
+        objects=objects,
         position=dict(
             x=start_x,
             y=start_y
@@ -209,49 +266,43 @@ def parse_player(header, player_number, num_players, save):
 def parse_lobby(data, version, save):
     """Parse lobby data."""
     LOGGER.debug("[parse_lobby] start pos=%d version=%s save=%.2f", data.tell(), version, save)
+    # Version-gated padding is summed and skipped with one seek
+    padding = 8
     if version is Version.DE:
-        data.read(5)
-        LOGGER.debug("[parse_lobby] skipped 5 bytes (DE) pos=%d", data.tell())
+        padding += 5
         if save >= 20.06:
-            data.read(9)
-            LOGGER.debug("[parse_lobby] skipped 9 bytes (>=20.06) pos=%d", data.tell())
+            padding += 9
         if save >= 26.16:
-            data.read(5)
-            LOGGER.debug("[parse_lobby] skipped 5 bytes (>=26.16) pos=%d", data.tell())
+            padding += 5
         if save >= 37:
-            data.read(8)
-            LOGGER.debug("[parse_lobby] skipped 8 bytes (>=37) pos=%d", data.tell())
+            padding += 8
         if save >= 64.3:
-            data.read(16)
-            LOGGER.debug("[parse_lobby] skipped 16 bytes (>=64.3) pos=%d", data.tell())
+            padding += 16
         if save >= 66.3:
-            data.read(1)
-            LOGGER.debug("[parse_lobby] skipped 1 byte (>=66.3) pos=%d", data.tell())
-    data.read(8)
+            padding += 1
     if version not in (Version.DE, Version.HD):
-        data.read(1)
-        LOGGER.debug("[parse_lobby] skipped 1 byte (non-DE/HD) pos=%d", data.tell())
+        padding += 1
+    data.seek(padding, 1)
+    LOGGER.debug("[parse_lobby] skipped %d bytes pos=%d", padding, data.tell())
     reveal_map_id, map_size, population, game_type_id, lock_teams = unpack('I4xIIbb', data)
     LOGGER.debug("[parse_lobby] reveal_map=%d map_size=%d pop=%d game_type=%d lock_teams=%d pos=%d",
                  reveal_map_id, map_size, population, game_type_id, lock_teams, data.tell())
     if version in (Version.DE, Version.HD):
-        data.read(5)
+        padding = 5
         if save >= 13.13:
-            data.read(4)
-            LOGGER.debug("[parse_lobby] skipped 4 bytes (>=13.13) pos=%d", data.tell())
+            padding += 4
         if save >= 25.22:
-            data.read(1)
-            LOGGER.debug("[parse_lobby] skipped 1 byte (>=25.22) pos=%d", data.tell())
-    chat_count = unpack('<I', data)
+            padding += 1
+        data.seek(padding, 1)
+        LOGGER.debug("[parse_lobby] skipped %d bytes (DE/HD) pos=%d", padding, data.tell())
+    chat_count = UINT32.unpack(data.read(4))[0]
     LOGGER.debug("[parse_lobby] chat_count=%d pos=%d", chat_count, data.tell())
-    chat = []
-    for _ in range(0, chat_count):
-        message = data.read(unpack('<I', data)).strip(b'\x00')
-        if len(message) > 0:
-            chat.append(message)
+    read, unpack_length = data.read, UINT32.unpack
+    messages = [read(unpack_length(read(4))[0]).strip(b'\x00') for _ in range(chat_count)]
+    chat = [message for message in messages if message]
     seed = None
     if version is Version.DE:
-        seed = unpack('<i', data)
+        seed = INT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_lobby] seed=%d pos=%d", seed, data.tell())
     LOGGER.debug("[parse_lobby] done pos=%d", data.tell())
     return dict(
@@ -268,45 +319,45 @@ def parse_lobby(data, version, save):
 def parse_map(data, version, save):
     """Parse map."""
     LOGGER.debug("[parse_map] start pos=%d version=%s save=%.2f", data.tell(), version, save)
-    tile_format = '<xbbx'
+    tile = TILE
     if version is Version.DE:
         if save >= 62.0:
-            tile_format = '<bxxb6x'
+            tile = TILE_DE62
             LOGGER.debug("[parse_map] tile_format: DE >= 62.0")
         else:
-            tile_format = '<bxb6x'
+            tile = TILE_DE
             LOGGER.debug("[parse_map] tile_format: DE < 62.0")
-        data.read(8)
+        data.seek(8, 1)
         LOGGER.debug("[parse_map] skipped 8 bytes (DE) pos=%d", data.tell())
     size_x, size_y, zone_num = unpack('<III', data)
     tile_num = size_x * size_y
     LOGGER.debug("[parse_map] size=%dx%d zone_num=%d tile_num=%d pos=%d", size_x, size_y, zone_num, tile_num, data.tell())
+    zone_size = 2048 + (tile_num * 2) if version in (Version.DE, Version.HD) else 1275 + tile_num
+    debug = LOGGER.isEnabledFor(logging.DEBUG)
     for zi in range(zone_num):
-        if version in (Version.DE, Version.HD):
-            data.read(2048 + (tile_num * 2))
-        else:
-            data.read(1275 + tile_num)
-        num_floats = unpack('<I', data)
-        data.read(num_floats * 4)
-        data.read(4)
-        LOGGER.debug("[parse_map] zone[%d] num_floats=%d pos=%d", zi, num_floats, data.tell())
+        data.seek(zone_size, 1)
+        num_floats = UINT32.unpack(data.read(4))[0]
+        data.seek(num_floats * 4 + 4, 1)
+        if debug:
+            LOGGER.debug("[parse_map] zone[%d] num_floats=%d pos=%d", zi, num_floats, data.tell())
     all_visible = unpack('<bx', data)
     LOGGER.debug("[parse_map] all_visible=%d, reading %d tiles pos=%d", all_visible, tile_num, data.tell())
-    tiles = [unpack(tile_format, data) for _ in range(tile_num)]
+    # Read the tile block once and unpack every record in one C-level pass
+    tiles = list(tile.iter_unpack(read_exact(data, tile_num * tile.size)))
     LOGGER.debug("[parse_map] after tiles pos=%d", data.tell())
     num_data = unpack('<I4x', data)
     LOGGER.debug("[parse_map] num_data=%d pos=%d", num_data, data.tell())
-    data.read(num_data * 4)
+    data.seek(num_data * 4, 1)
     for i in range(0, num_data):
-        num_obs = unpack('<I', data)
-        data.read(num_obs * 8)
-    x2, y2 = unpack('<II', data)
+        num_obs = UINT32.unpack(data.read(4))[0]
+        data.seek(num_obs * 8, 1)
+    x2, y2 = UINT32_PAIR.unpack(data.read(8))
     LOGGER.debug("[parse_map] x2=%d y2=%d pos=%d", x2, y2, data.tell())
-    data.read(x2 * y2 * 4)
+    data.seek(x2 * y2 * 4, 1)
     if save >= 61.5:
-        data.read(x2 * y2 * 4)
+        data.seek(x2 * y2 * 4, 1)
         LOGGER.debug("[parse_map] skipped extra %d bytes (>=61.5) pos=%d", x2 * y2 * 4, data.tell())
-    restore_time = unpack('<I', data)
+    restore_time = UINT32.unpack(data.read(4))[0]
     LOGGER.debug("[parse_map] restore_time=%d pos=%d", restore_time, data.tell())
     return dict(
         all_visible=all_visible == 1,
@@ -319,79 +370,68 @@ def parse_map(data, version, save):
 def parse_scenario(data, num_players, version, save):
     """Parse scenario section."""
     LOGGER.debug("[parse_scenario] start pos=%d version=%s save=%.2f", data.tell(), version, save)
-    scenario_version = unpack('<f', data)
-    data.read(4)
+    scenario_version = FLOAT32.unpack(data.read(4))[0]
     LOGGER.debug("[parse_scenario] scenario_version=%.2f pos=%d", scenario_version, data.tell())
+    # Version-gated header, then player names and ids, skipped with one seek
+    padding = 4
     if save >= 61.5:
-        data.read(4)
+        padding += 4
         if save < 66.6:
-            data.read(4)
-        LOGGER.debug("[parse_scenario] after version-specific header pos=%d", data.tell())
-    data.read(16 * 256)
-    data.read(16 * 4)
+            padding += 4
+    padding += (16 * 256) + (16 * 4)
+    data.seek(padding, 1)
     LOGGER.debug("[parse_scenario] after names+ids pos=%d", data.tell())
     if save >= 66.6:
         for i in range(0, 16):
-            data.read(8)
+            data.seek(8, 1)
             de_string(data)
             de_string(data)
-            data.read(4)
+            data.seek(4, 1)
         LOGGER.debug("[parse_scenario] after 66.6 player data pos=%d", data.tell())
+    padding = 1
     if save >= 61.5 and save < 66.6:
-        data.read(64)
-        LOGGER.debug("[parse_scenario] after 61.5 padding pos=%d", data.tell())
+        padding += 64
     if save < 66.6:
-        for i in range(0, 16):
-            data.read(12)
-            if save >= 13.34:
-                data.read(4)
-            data.read(4)
-        LOGGER.debug("[parse_scenario] after old player data pos=%d", data.tell())
-    data.read(1)
-    elapsed_time = unpack('<f', data)
+        # Old-style player data: 16 fixed-size entries
+        padding += 16 * (20 if save >= 13.34 else 16)
+    data.seek(padding, 1)
+    LOGGER.debug("[parse_scenario] after old player data pos=%d", data.tell())
+    elapsed_time = FLOAT32.unpack(data.read(4))[0]
     LOGGER.debug("[parse_scenario] elapsed_time=%.2f pos=%d", elapsed_time, data.tell())
+    padding = 0
     if version is Version.DE:
-        data.read(64)
-        LOGGER.debug("[parse_scenario] after DE 64-byte block pos=%d", data.tell())
+        padding += 64
     if save >= 66.6:
-        data.read(68)
-        LOGGER.debug("[parse_scenario] after 66.6 68-byte block pos=%d", data.tell())
+        padding += 68
+    data.seek(padding, 1)
+    LOGGER.debug("[parse_scenario] after DE/66.6 blocks pos=%d", data.tell())
     scenario_filename = aoc_string(data)
     LOGGER.debug("[parse_scenario] scenario_filename=%s pos=%d", scenario_filename, data.tell())
-    data.read(24)
+    data.seek(24, 1)
     LOGGER.debug("[parse_scenario] after message IDs pos=%d", data.tell())
     instructions = aoc_string(data)
     LOGGER.debug("[parse_scenario] instructions len=%d pos=%d", len(instructions), data.tell())
     for _ in range(0, 9):
         aoc_string(data)
-    data.read(78)
+    data.seek(78, 1)
     for _ in range(0, 16):
         aoc_string(data)
-    data.read(196)
+    data.seek(196, 1)
     LOGGER.debug("[parse_scenario] after strings+196 pos=%d", data.tell())
-    for _ in range(0, 16):
-        data.read(24)
-        if version in (Version.DE, Version.HD):
-            data.read(4)
-    data.read(12672)
-    LOGGER.debug("[parse_scenario] after 12672-byte block pos=%d", data.tell())
+    # 16 fixed-size entries, the 12672-byte block and version-gated padding
+    padding = 16 * (28 if version in (Version.DE, Version.HD) else 24)
+    padding += 12672
     if version is Version.DE:
-        data.read(196)
-        LOGGER.debug("[parse_scenario] skipped 196 bytes (DE) pos=%d", data.tell())
+        padding += 196
     else:
-        for _ in range(0, 16):
-            data.read(332)
-        LOGGER.debug("[parse_scenario] skipped 16*332 bytes (non-DE) pos=%d", data.tell())
-    if version is Version.HD:
-        data.read(644)
-        LOGGER.debug("[parse_scenario] skipped 644 bytes (HD) pos=%d", data.tell())
-    data.read(88)
+        padding += 16 * 332
     if version is Version.HD:
-        data.read(16)
-        LOGGER.debug("[parse_scenario] skipped 16 bytes (HD) pos=%d", data.tell())
-    map_id, difficulty_id = unpack('<II', data)
+        padding += 644 + 16
+    padding += 88
+    data.seek(padding, 1)
+    LOGGER.debug("[parse_scenario] skipped %d bytes pos=%d", padding, data.tell())
+    map_id, difficulty_id = UINT32_PAIR.unpack(data.read(8))
     LOGGER.debug("[parse_scenario] map_id=%d difficulty_id=%d pos=%d", map_id, difficulty_id, data.tell())
-    remainder = data.read()
     if version is Version.DE:
         if save >= 66.3:
             settings_version = 4.5
@@ -415,41 +455,45 @@ def parse_scenario(data, num_players, version, save):
             settings_version = 2.4
         else:
             settings_version = 2.2
-        LOGGER.debug("[parse_scenario] seeking settings_version=%.1f in remainder of %d bytes", settings_version, len(remainder))
-        end = remainder.find(struct.pack('<d', settings_version)) + 8
+        LOGGER.debug("[parse_scenario] seeking settings_version=%.1f", settings_version)
+        end = find_ahead(data, struct.pack('<d', settings_version)) + 8
     else:
-        end = remainder.find(b'\x9a\x99\x99\x99\x99\x99\xf9\x3f') + 13
-    LOGGER.debug("[parse_scenario] settings anchor end=%d, seeking by %d", end, end - len(remainder))
-    data.seek(end - len(remainder), 1)
+        end = find_ahead(data, b'\x9a\x99\x99\x99\x99\x99\xf9\x3f') + 13
+    LOGGER.debug("[parse_scenario] settings anchor end=%d", end)
+    data.seek(end, 1)
     LOGGER.debug("[parse_scenario] after settings seek pos=%d", data.tell())
 
     if version is Version.DE:
-        data.read(1)
-        n_triggers = unpack("<I", data)
+        data.seek(1, 1)
+        n_triggers = UINT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_scenario] n_triggers=%d pos=%d", n_triggers, data.tell())
 
+        # Checked once, since these lines run per trigger
+        debug = LOGGER.isEnabledFor(logging.DEBUG)
+        # Trigger contents are not returned, so their strings are skipped, not read
         for ti in range(n_triggers):
-            data.read(22)
-            data.read(4)
+            data.seek(26, 1)
 
-            description = int_prefixed_string(data)
+            skip_int_prefixed_string(data)  # description
             name = int_prefixed_string(data)
-            short_description = int_prefixed_string(data)
+            skip_int_prefixed_string(data)  # short description
 
-            n_effects = unpack("<I", data)
-            LOGGER.debug("[parse_scenario] trigger[%d] name=%s n_effects=%d pos=%d", ti, name, n_effects, data.tell())
+            n_effects = UINT32.unpack(data.read(4))[0]
+            if debug:
+                LOGGER.debug("[parse_scenario] trigger[%d] name=%s n_effects=%d pos=%d", ti, name, n_effects, data.tell())
 
             for _ in range(n_effects):
-                data.read(216)
+                data.seek(216, 1)
 
-                text = int_prefixed_string(data)
-                sound = int_prefixed_string(data)
+                skip_int_prefixed_string(data)  # text
+                skip_int_prefixed_string(data)  # sound
 
-            data.read(n_effects * 4)
-            n_condition = unpack("<I", data)
-            LOGGER.debug("[parse_scenario] trigger[%d] n_condition=%d pos=%d", ti, n_condition, data.tell())
+            data.seek(n_effects * 4, 1)
+            n_condition = UINT32.unpack(data.read(4))[0]
+            if debug:
+                LOGGER.debug("[parse_scenario] trigger[%d] n_condition=%d pos=%d", ti, n_condition, data.tell())
 
-            data.read(n_condition * 125)
+            data.seek(n_condition * 125, 1)
 
         trigger_list_order = unpack(f"<{n_triggers}I", data)
         LOGGER.debug("[parse_scenario] after triggers pos=%d", data.tell())
@@ -470,14 +514,14 @@ def string_block(data):
     """Parse DE header string block."""
     strings = []
     while True:
-        crc = unpack("<I", data)
+        crc = UINT32.unpack(data.read(4))[0]
         if 255 > crc > 0:
             break
         strings.append(de_string(data).decode('utf-8').split(':'))
     return strings
 
 
-def parse_de(data, version, save, skip=False):
+def parse_de(data, version, save, skip=False, hasher=hashlib.sha1):
     """Parse DE-specific header."""
     LOGGER.debug("[parse_de] start pos=%d version=%s save=%.2f skip=%s", data.tell(), version, save, skip)
     if version is not Version.DE:
@@ -485,112 +529,79 @@ def parse_de(data, version, save, skip=False):
         return None
     build = None
     if save >= 25.22 and not skip:
-        build = unpack('<I', data)
+        build = UINT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_de] build=%d pos=%d", build, data.tell())
     timestamp = None
     if save >= 26.16 and not skip:
-        timestamp = unpack('<I', data)  # missing on console (?)
+        timestamp = UINT32.unpack(data.read(4))[0]  # missing on console (?)
         LOGGER.debug("[parse_de] timestamp=%d pos=%d", timestamp, data.tell())
-    data.read(12)
-    LOGGER.debug("[parse_de] after 12-byte skip pos=%d", data.tell())
-    dlc_ids = []
-    dlc_count = unpack('<I', data)
+    dlc_count = unpack('<12xI', data)
     LOGGER.debug("[parse_de] dlc_count=%d pos=%d", dlc_count, data.tell())
-    for i in range(0, dlc_count):
-        dlc_ids.append(unpack('<I', data))
+    dlc_ids = list(unpack(f'<{dlc_count}I', data, shorten=False))
     LOGGER.debug("[parse_de] dlc_ids=%s pos=%d", dlc_ids, data.tell())
-    data.read(4)
+    data.seek(4, 1)
     if save >= 61.5:
-        map_dimension = unpack('<I', data)
+        map_dimension = UINT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_de] map_dimension=%d pos=%d", map_dimension, data.tell())
     else:
-        difficulty_id = unpack('<I', data)
+        difficulty_id = UINT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_de] difficulty_id (pre-61.5)=%d pos=%d", difficulty_id, data.tell())
-    data.read(4)
-    rms_map_id = unpack('<I', data)
-    LOGGER.debug("[parse_de] rms_map_id=%d pos=%d", rms_map_id, data.tell())
-    data.read(4)
-    victory_type_id = unpack('<I', data)
-    starting_resources_id = unpack('<I', data)
-    starting_age_id = unpack('<I', data)
-    ending_age_id = unpack('<I', data)
-    LOGGER.debug("[parse_de] victory=%d resources=%d start_age=%d end_age=%d pos=%d",
-                 victory_type_id, starting_resources_id, starting_age_id, ending_age_id, data.tell())
-    data.read(12)
-    speed = unpack('<f', data)
-    treaty_length = unpack('<I', data)
-    population_limit = unpack('<I', data)
-    num_players = unpack('<I', data)
+    (rms_map_id, victory_type_id, starting_resources_id, starting_age_id, ending_age_id,
+     speed, treaty_length, population_limit, num_players) = unpack('<4xI4x4I12xf3I', data)
+    LOGGER.debug("[parse_de] rms_map_id=%d victory=%d resources=%d start_age=%d end_age=%d pos=%d",
+                 rms_map_id, victory_type_id, starting_resources_id, starting_age_id, ending_age_id, data.tell())
     LOGGER.debug("[parse_de] speed=%.2f treaty=%d pop=%d num_players=%d pos=%d",
                  speed, treaty_length, population_limit, num_players, data.tell())
-    data.read(14)
+    data.seek(14, 1)
     if save >= 61.5:
         # not sure if this is difficulty under 61.5 or not
         difficulty_id = unpack('<B', data)
         LOGGER.debug("[parse_de] difficulty_id (>=61.5)=%d pos=%d", difficulty_id, data.tell())
-    random_positions, all_technologies = unpack('<bb', data)
-    data.read(1)
-    lock_teams = unpack('<b', data)
-    lock_speed = unpack('<b', data)
-    multiplayer = unpack('<b', data)
-    cheats = unpack('<b', data)
-    record_game = unpack('<b', data)
-    animals_enabled = unpack('<b', data)
-    predators_enabled = unpack('<b', data)
-    turbo_enabled = unpack('<b', data)
-    shared_exploration = unpack('<b', data)
-    team_positions = unpack('<b', data)
+    (random_positions, all_technologies, lock_teams, lock_speed, multiplayer, cheats, record_game,
+     animals_enabled, predators_enabled, turbo_enabled, shared_exploration,
+     team_positions) = unpack('<bbx10b', data)
     LOGGER.debug("[parse_de] flags: random_pos=%d all_tech=%d lock_teams=%d lock_speed=%d multi=%d cheats=%d rec=%d pos=%d",
                  random_positions, all_technologies, lock_teams, lock_speed, multiplayer, cheats, record_game, data.tell())
-    data.read(12)
-    if save >= 25.06:
-        data.read(1)
-        LOGGER.debug("[parse_de] skipped 1 byte (>=25.06) pos=%d", data.tell())
-    if save > 50:
-        data.read(1)
-        LOGGER.debug("[parse_de] skipped 1 byte (>50) pos=%d", data.tell())
+    padding = _padding(save, 12, _DE_FLAGS_PADDING)
+    data.seek(padding, 1)
+    LOGGER.debug("[parse_de] skipped %d bytes pos=%d", padding, data.tell())
     num_player_entries = num_players if 66.3 > save >= 37 else 8
     LOGGER.debug("[parse_de] reading %d player entries pos=%d", num_player_entries, data.tell())
     players = []
+    player_padding = _padding(save, 1, _DE_PLAYER_PADDING)
+    debug = LOGGER.isEnabledFor(logging.DEBUG)
     for pi in range(num_player_entries):
         player_start = data.tell()
-        data.read(4)
-        color_id = unpack('<i', data)
-        data.read(2)
-        team_id = unpack('<b', data)
-        data.read(9)
-        civilization_id = unpack('<I', data)
+        color_id, team_id, civilization_id = DE_PLAYER.unpack(data.read(24))
         custom_civ_selection = None
         if save >= 61.5:
-            custom_civ_count = unpack('<I', data)
-            LOGGER.debug("[parse_de] player[%d] custom_civ_count=%d pos=%d", pi, custom_civ_count, data.tell())
+            custom_civ_count = UINT32.unpack(data.read(4))[0]
+            if debug:
+                LOGGER.debug("[parse_de] player[%d] custom_civ_count=%d pos=%d", pi, custom_civ_count, data.tell())
             if save >= 63.0 and custom_civ_count > 0:
-                custom_civ_selection = []
-                for _ in range(custom_civ_count):
-                    custom_civ_selection.append(unpack('<I', data))
+                custom_civ_selection = list(unpack(f'<{custom_civ_count}I', data, shorten=False))
         de_string(data)
-        data.read(1)
+        data.seek(1, 1)
         ai_name = de_string(data)
         if save >= 66.3:
             censored_name = de_string(data)
-            LOGGER.debug("[parse_de] player[%d] censored_name=%s pos=%d", pi, censored_name, data.tell())
+            if debug:
+                LOGGER.debug("[parse_de] player[%d] censored_name=%s pos=%d", pi, censored_name, data.tell())
         name = de_string(data)
-        type = unpack('<I', data)
-        profile_id, number = unpack('<I4xi', data)
-        LOGGER.debug("[parse_de] player[%d] start_pos=%d name=%s civ=%d color=%d team=%d type=%d profile=%d number=%d",
-                     pi, player_start, name, civilization_id, color_id, team_id, type, profile_id, number)
+        type, profile_id, number = DE_PLAYER_ID.unpack(data.read(16))
+        if debug:
+            LOGGER.debug("[parse_de] player[%d] start_pos=%d name=%s civ=%d color=%d team=%d type=%d profile=%d number=%d",
+                         pi, player_start, name, civilization_id, color_id, team_id, type, profile_id, number)
         if save < 25.22:
-            data.read(8)
-        prefer_random = unpack('b', data)
-        data.read(1)
-        if save >= 25.06:
-            data.read(8)
-        if save >= 64.3:
-            data.read(4)
-            LOGGER.debug("[parse_de] player[%d] skipped 4 bytes (>=64.3) pos=%d", pi, data.tell())
+            data.seek(8, 1)
+        prefer_random = INT8.unpack(data.read(1))[0]
+        data.seek(player_padding, 1)
+        if debug:
+            LOGGER.debug("[parse_de] player[%d] skipped %d bytes pos=%d", pi, player_padding, data.tell())
         if save >= 67.2:
             _ = de_string(data)
-            LOGGER.debug("[parse_de] player[%d] skipped extra de_string (>=67.2) pos=%d", pi, data.tell())
+            if debug:
+                LOGGER.debug("[parse_de] player[%d] skipped extra de_string (>=67.2) pos=%d", pi, data.tell())
 
         players.append(dict(
             number=number,
@@ -606,107 +617,75 @@ def parse_de(data, version, save, skip=False):
             prefer_random=prefer_random == 1
         ))
     LOGGER.debug("[parse_de] after player loop pos=%d", data.tell())
-    data.read(12)
+    data.seek(12, 1)
     if 66.3 > save >= 37:
         empty_slots = 8 - num_players
         LOGGER.debug("[parse_de] reading %d empty player slots pos=%d", empty_slots, data.tell())
+        # Fixed parts around the slot strings, by save version
+        slot_head = 16 if save >= 61.5 else 12
+        slot_tail = 42 if save >= 64.3 else 38
         for _ in range(empty_slots):
-            if save >= 61.5:
-                data.read(4)
-            data.read(12)
+            data.seek(slot_head, 1)
             de_string(data)
-            data.read(1)
+            data.seek(1, 1)
             de_string(data)
             de_string(data)
-            data.read(38)
-            if save >= 64.3:
-                data.read(4)
+            data.seek(slot_tail, 1)
     LOGGER.debug("[parse_de] after empty slots pos=%d", data.tell())
-    data.read(4)
-    rated = unpack('b', data)
-    allow_specs = unpack('b', data)
-    visibility = unpack('<I', data)
-    hidden_civs = unpack('b', data)
-    data.read(1)
-    spec_delay = unpack('<I', data)
+    rated, allow_specs, visibility, hidden_civs, spec_delay = unpack('<4xbbIbxI', data)
     LOGGER.debug("[parse_de] rated=%d allow_specs=%d visibility=%d hidden_civs=%d spec_delay=%d pos=%d",
                  rated, allow_specs, visibility, hidden_civs, spec_delay, data.tell())
-    data.read(1)
+    data.seek(1, 1)
     LOGGER.debug("[parse_de] reading string blocks pos=%d", data.tell())
     strings = string_block(data)
-    data.read(8)
+    data.seek(8, 1)
     for _ in range(20):
         strings += string_block(data)
     LOGGER.debug("[parse_de] after string blocks: %d strings total pos=%d", len(strings), data.tell())
-    data.read(4)
+    data.seek(4, 1)
     if save < 25.22:
-        data.read(236)
+        data.seek(236, 1)
         LOGGER.debug("[parse_de] skipped 236 bytes (<25.22) pos=%d", data.tell())
     if save >= 25.22:
         data.seek(-4, 1)
-        l = unpack('<I', data)
+        l = UINT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_de] unknown list length=%d pos=%d", l, data.tell())
-        data.read(l * 4)
+        data.seek(l * 4, 1)
     unknown_entries = unpack('<Q', data)
     LOGGER.debug("[parse_de] unknown_entries (Q)=%d pos=%d", unknown_entries, data.tell())
     for _ in range(unknown_entries):
-        data.read(4)
+        data.seek(4, 1)
         de_string(data)
-        data.read(4)
+        data.seek(4, 1)
     if save >= 25.02:
-        data.read(8)
+        data.seek(8, 1)
         LOGGER.debug("[parse_de] skipped 8 bytes (>=25.02) pos=%d", data.tell())
     guid = data.read(16)
-    LOGGER.debug("[parse_de] guid=%s pos=%d", guid.hex(), data.tell())
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("[parse_de] guid=%s pos=%d", guid.hex(), data.tell())
     lobby = de_string(data)
     LOGGER.debug("[parse_de] lobby=%s pos=%d", lobby, data.tell())
     if save >= 25.22:
-        data.read(8)
+        data.seek(8, 1)
         LOGGER.debug("[parse_de] skipped 8 bytes (>=25.22) pos=%d", data.tell())
     mod = de_string(data)
     LOGGER.debug("[parse_de] mod=%s pos=%d", mod, data.tell())
-    data.read(33)
-    if save >= 20.06:
-        data.read(1)
-        LOGGER.debug("[parse_de] skipped 1 byte (>=20.06) pos=%d", data.tell())
-    if save >= 20.16:
-        data.read(8)
-        LOGGER.debug("[parse_de] skipped 8 bytes (>=20.16) pos=%d", data.tell())
-    if save >= 25.06:
-        data.read(21)
-        LOGGER.debug("[parse_de] skipped 21 bytes (>=25.06) pos=%d", data.tell())
-    if save >= 25.22:
-        data.read(4)
-        LOGGER.debug("[parse_de] skipped 4 bytes (>=25.22) pos=%d", data.tell())
-    if save >= 26.16:
-        data.read(8)
-        LOGGER.debug("[parse_de] skipped 8 bytes (>=26.16) pos=%d", data.tell())
-    if save >= 37:
-        data.read(3)
-        LOGGER.debug("[parse_de] skipped 3 bytes (>=37) pos=%d", data.tell())
-    if save > 50:
-        data.read(8)
-        LOGGER.debug("[parse_de] skipped 8 bytes (>50) pos=%d", data.tell())
-    if save >= 61.5:
-        data.read(1)
-        LOGGER.debug("[parse_de] skipped 1 byte (>=61.5) pos=%d", data.tell())
-    if save >= 63:
-        data.read(5)
-        LOGGER.debug("[parse_de] skipped 5 bytes (>=63) pos=%d", data.tell())
+    padding = _padding(save, 33, _DE_MOD_PADDING)
+    data.seek(padding, 1)
+    LOGGER.debug("[parse_de] skipped %d bytes after mod pos=%d", padding, data.tell())
     if save >= 66.3:
-        c = unpack('<I', data)
+        c = UINT32.unpack(data.read(4))[0]
         LOGGER.debug("[parse_de] >=66.3 extra block c=%d pos=%d", c, data.tell())
-        data.read(12)
-        data.read(c * 4)
+        data.seek(12 + (c * 4), 1)
     if not skip:
         de_string(data)
     if save >= 67.2:
         _ = de_string(data)
         _ = de_string(data)
-    data.read(8)
+    data.seek(8, 1)
     LOGGER.debug("[parse_de] after de_string+8 pos=%d", data.tell())
     if not skip and save >= 37:
-        timestamp, x = unpack('<II', data)
+        timestamp, x = UINT32_PAIR.unpack(data.read(8))
         LOGGER.debug("[parse_de] timestamp=%d x=%d pos=%d", timestamp, x, data.tell())
     LOGGER.debug("[parse_de] done pos=%d", data.tell())
     rms_mod_id = None
@@ -717,8 +696,8 @@ def parse_de(data, version, save, skip=False):
             rms_filename = s[2]
     return dict(
         players=players,
-        guid=str(uuid.UUID(bytes=guid)),
-        hash=hashlib.sha1(guid),
+        guid=_format_guid(guid),
+        hash=hasher(guid),
         lobby=lobby.decode('utf-8'),
         mod=mod.decode('utf-8'),
         difficulty_id=difficulty_id,
@@ -761,30 +740,25 @@ def parse_hd(data, version, save):
     if version is not Version.HD or save <= 12.34:
         LOGGER.debug("[parse_hd] not HD or save<=12.34, skipping")
         return None
-    data.read(12)
-    dlc_count = unpack('<I', data)
+    dlc_count = unpack('<12xI', data)
     LOGGER.debug("[parse_hd] dlc_count=%d pos=%d", dlc_count, data.tell())
-    data.read(dlc_count * 4)
-    data.read(4)
-    difficulty_id, map_id = unpack('<II', data)
+    data.seek(dlc_count * 4, 1)
+    difficulty_id, map_id = unpack('<4xII', data)
     LOGGER.debug("[parse_hd] difficulty_id=%d map_id=%d pos=%d", difficulty_id, map_id, data.tell())
-    data.read(80)
+    data.seek(80, 1)
     players = []
+    debug = LOGGER.isEnabledFor(logging.DEBUG)
     for pi in range(8):
         player_start = data.tell()
-        data.read(4)
-        color_id = unpack('<i', data)
-        data.read(12)
-        civilization_id = unpack('<I', data)
+        color_id, civilization_id = HD_PLAYER.unpack(data.read(24))
         hd_string(data)
-        data.read(1)
+        data.seek(1, 1)
         hd_string(data)
         name = hd_string(data)
-        data.read(4)
-        steam_id, number = unpack('<Qi', data)
-        data.read(8)
-        LOGGER.debug("[parse_hd] player[%d] start_pos=%d name=%s civ=%d color=%d number=%d",
-                     pi, player_start, name, civilization_id, color_id, number)
+        steam_id, number = HD_PLAYER_ID.unpack(data.read(24))
+        if debug:
+            LOGGER.debug("[parse_hd] player[%d] start_pos=%d name=%s civ=%d color=%d number=%d",
+                         pi, player_start, name, civilization_id, color_id, number)
         if name:
             players.append(dict(
                 number=number,
@@ -794,25 +768,26 @@ def parse_hd(data, version, save):
                 civilization_id=civilization_id
             ))
     LOGGER.debug("[parse_hd] after player loop pos=%d", data.tell())
-    data.read(26)
+    data.seek(26, 1)
     hd_string(data)
-    data.read(8)
+    data.seek(8, 1)
     hd_string(data)
-    data.read(8)
+    data.seek(8, 1)
     hd_string(data)
-    data.read(8)
+    data.seek(8, 1)
     guid = data.read(16)
-    LOGGER.debug("[parse_hd] guid=%s pos=%d", guid.hex(), data.tell())
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("[parse_hd] guid=%s pos=%d", guid.hex(), data.tell())
     lobby = hd_string(data)
     mod = hd_string(data)
     LOGGER.debug("[parse_hd] lobby=%s mod=%s pos=%d", lobby, mod, data.tell())
-    data.read(8)
+    data.seek(8, 1)
     hd_string(data)
-    data.read(4)
+    data.seek(4, 1)
     LOGGER.debug("[parse_hd] done pos=%d", data.tell())
     return dict(
         players=players,
-        guid=str(uuid.UUID(bytes=guid)),
+        guid=_format_guid(guid),
         lobby=lobby.decode('utf-8'),
         mod=mod.decode('utf-8'),
         map_id=map_id,
@@ -823,11 +798,11 @@ def parse_hd(data, version, save):
 def decompress(data):
     """Decompress header bytes."""
     prefix_size = 8
-    header_len, chapter_address = unpack('<II', data)
+    header_len, chapter_address = UINT32_PAIR.unpack(data.read(8))
     LOGGER.debug("[decompress] header_len=%d chapter_address=%d raw_pos_after_prefix=%d", header_len, chapter_address, data.tell())
     zlib_header = data.read(header_len - prefix_size)
     LOGGER.debug("[decompress] read %d compressed bytes, raw_pos_now=%d", len(zlib_header), data.tell())
-    decompressed = zlib.decompress(zlib_header, wbits=ZLIB_WBITS)
+    decompressed = raw_inflate(zlib_header)
     LOGGER.debug("[decompress] decompressed to %d bytes", len(decompressed))
     return io.BytesIO(decompressed)
 
@@ -835,28 +810,29 @@ def decompress(data):
 def parse_version(header, data):
     """Parse and compute game version."""
     LOGGER.debug("[parse_version] header_pos=%d raw_pos=%d", header.tell(), data.tell())
-    log = unpack('<I', data)
+    log = UINT32.unpack(data.read(4))[0]
     LOGGER.debug("[parse_version] log_version=%d", log)
     game, save = unpack('<7sxf', header)
     LOGGER.debug("[parse_version] game_version=%s save_version_raw=%.2f", game, save)
     if save == -1:
-        save = unpack('<I', header)
+        save = UINT32.unpack(header.read(4))[0]
         LOGGER.debug("[parse_version] new-style save int=%d", save)
         if save == 37:
             save = 37.0
         else:
             save /= (1<<16)
-    version = get_version(game.decode('ascii'), round(save, 2), log)
-    LOGGER.debug("[parse_version] detected version=%s save=%.2f", version, round(save, 2))
-    return version, game.decode('ascii'), round(save, 2), log
+    game, save = game.decode('ascii'), round(save, 2)
+    version = get_version(game, save, log)
+    LOGGER.debug("[parse_version] detected version=%s save=%.2f", version, save)
+    return version, game, save, log
 
 
 def parse_players(header, num_players, version, save):
     """Parse all players."""
     LOGGER.debug("[parse_players] start pos=%d num_players=%d version=%s save=%.2f", header.tell(), num_players, version, save)
     cur = header.tell()
-    gaia = b'Gaia' if version in (Version.DE, Version.HD) else b'GAIA'
-    anchor = header.read().find(b'\x05\x00' + gaia + b'\x00')
+    gaia = GAIA_DE if version in (Version.DE, Version.HD) else GAIA_UP
+    anchor = find_ahead(header, gaia)
     rev = 43
     if save >= 61.5:
         rev = 7 + (num_players * 4)
@@ -867,21 +843,19 @@ def parse_players(header, num_players, version, save):
     LOGGER.debug("[parse_players] mod=%s pos=%d", mod, header.tell())
     players = [parse_player(header, number, num_players, save) for number in range(num_players)]
     LOGGER.debug("[parse_players] after %d players pos=%d", num_players, header.tell())
-    cur = header.tell()
-    pv = b'\x00\x00\x00@'
-    if save >= 61.5:
-        pv = b'\x66\x66\x06\x40'
-    points_version = header.read().find(pv)
+    pv = POINTS_VERSION_61_5 if save >= 61.5 else POINTS_VERSION
+    points_version = find_ahead(header, pv)
     LOGGER.debug("[parse_players] points_version marker found at cur+%d", points_version)
-    header.seek(cur)
-    header.read(points_version)
+    skip_bytes(header, points_version)
+    debug = LOGGER.isEnabledFor(logging.DEBUG)
     for pi in range(num_players):
-        pver = unpack('<f', header)
-        entries = unpack('<i', header)
-        header.read(5 + (entries * 44))
-        points = unpack('<i', header)
-        header.read(8 + (points * 32))
-        LOGGER.debug("[parse_players] points block[%d] pver=%.2f entries=%d points=%d pos=%d", pi, pver, entries, points, header.tell())
+        pver, entries = POINTS_BLOCK.unpack(header.read(8))
+        skip_bytes(header, 5 + (entries * 44))
+        points = INT32.unpack(header.read(4))[0]
+        skip_bytes(header, 8 + (points * 32))
+        if debug:
+            LOGGER.debug("[parse_players] points block[%d] pver=%.2f entries=%d points=%d pos=%d",
+                         pi, pver, entries, points, header.tell())
     LOGGER.debug("[parse_players] done pos=%d", header.tell())
     return [p[0] for p in players], mod, players[0][1]
 
@@ -889,7 +863,7 @@ def parse_players(header, num_players, version, save):
 def parse_metadata(header, save, skip_ai=True):
     """Parse recorded game metadata."""
     LOGGER.debug("[parse_metadata] start pos=%d save=%.2f", header.tell(), save)
-    ai = unpack('<I', header)
+    ai = UINT32.unpack(header.read(4))[0]
     LOGGER.debug("[parse_metadata] ai=%d pos=%d", ai, header.tell())
 
     if ai > 0:
@@ -897,15 +871,11 @@ def parse_metadata(header, save, skip_ai=True):
         if not skip_ai:
             raise RuntimeError("don't know how to parse ai")
 
-        offset = header.tell()
-        data = header.read()
         # Jump to the end of ai data
-        ai_end = re.search(
-            b'\00' * 4096,
-            data)
-        if not ai_end:
+        ai_end = find_ahead(header, AI_END)
+        if ai_end < 0:
             raise RuntimeError("could not find ai end")
-        header.seek(offset + ai_end.end())
+        header.seek(ai_end + len(AI_END), 1)
         LOGGER.debug("[parse_metadata] AI end found, pos=%d", header.tell())
 
     game_speed, owner_id, num_players, cheats = unpack('<24xf17xhbxb', header)
@@ -913,10 +883,10 @@ def parse_metadata(header, save, skip_ai=True):
                  game_speed, owner_id, num_players, cheats, header.tell())
 
     if save < 61.5:
-        header.read(60)
+        header.seek(60, 1)
         LOGGER.debug("[parse_metadata] skipped 60 bytes (<61.5) pos=%d", header.tell())
     else:
-        header.read(24 + (num_players * 4))
+        skip_bytes(header, 24 + (num_players * 4))
         LOGGER.debug("[parse_metadata] skipped %d bytes (>=61.5) pos=%d", 24 + (num_players * 4), header.tell())
 
     LOGGER.debug("[parse_metadata] done pos=%d", header.tell())
@@ -929,6 +899,11 @@ def parse_metadata(header, save, skip_ai=True):
 
 def parse(data):
     """Parse recorded game header."""
+    return _parse(data, hashlib.sha1)
+
+
+def _parse(data, hasher):
+    """Parse recorded game header, building the DE hash with `hasher`."""
     LOGGER.debug("[parse] start")
     try:
         header = decompress(data)
@@ -938,7 +913,7 @@ def parse(data):
         if version not in (Version.USERPATCH15, Version.DE, Version.HD):
             raise RuntimeError(f"{version} not supported")
         LOGGER.debug("[parse] calling parse_de")
-        de = parse_de(header, version, save)
+        de = parse_de(header, version, save, hasher=hasher)
         LOGGER.debug("[parse] parse_de done, calling parse_hd")
         hd = parse_hd(header, version, save)
         LOGGER.debug("[parse] parse_hd done, calling parse_metadata")
@@ -952,9 +927,10 @@ def parse(data):
         LOGGER.debug("[parse] parse_scenario done, calling parse_lobby")
         lobby = parse_lobby(header, version, save)
         LOGGER.debug("[parse] parse_lobby done")
-    except (struct.error, zlib.error, AssertionError, MemoryError, ValueError) as e:
+    except (struct.error, *INFLATE_ERRORS, AssertionError, MemoryError, ValueError) as e:
         hdr = locals().get('header')
-        if hdr is not None:
+        # The hex dump is only ever logged at debug level, so don't build it otherwise
+        if hdr is not None and LOGGER.isEnabledFor(logging.DEBUG):
             fail_pos = hdr.tell()
             start = max(0, fail_pos - HEXDUMP_CONTEXT)
             hdr.seek(start)
@@ -962,9 +938,9 @@ def parse(data):
             LOGGER.debug(
                 "[parse] FAILURE at header pos=%d\n%s",
                 fail_pos,
-                _hexdump(context_bytes, base_offset=start, mark=fail_pos),
+                hexdump(context_bytes, base_offset=start, mark=fail_pos),
             )
-        raise RuntimeError(f"could not parse: {e}")
+        raise RuntimeError(f"could not parse: {e}") from e
     return dict(
         version=version,
         game_version=game,
@@ -980,3 +956,44 @@ def parse(data):
         lobby=lobby,
         device=device
     )
+
+
+def _parse_chunk(sources):
+    """Parse a list of parse_many() sources in a worker process."""
+    # hashlib objects can't be pickled, so the hash is sent as its raw
+    # input (the guid bytes) and parse_many() rebuilds it
+    headers = []
+    for source in sources:
+        if isinstance(source, (bytes, bytearray)):
+            headers.append(_parse(io.BytesIO(source), bytes))
+            continue
+        with open(source, 'rb') as handle:
+            headers.append(_parse(handle, bytes))
+    return headers
+
+
+def parse_many(sources, workers=None, chunksize=16):
+    """Parse many recorded game headers in parallel.
+
+    `sources` are paths, or the bytes of whole recordings. They are parsed
+    in a pool of `workers` processes (default: one per CPU), `chunksize` per
+    task, and results are yielded in input order, as parse() would return
+    them. The first failure is raised when its result is reached.
+
+    `sources` is consumed lazily: only two chunks per worker are in flight,
+    so a long iterable of bytes is never held in memory all at once. Closing
+    the generator early cancels the chunks that have not started yet.
+    """
+    # Imported here so that `import mgz.fast.header` doesn't load multiprocessing
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+    chunks = iter(lambda it=iter(sources): list(islice(it, chunksize)), [])
+    window = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Closed before the executor, which waits for every submitted chunk
+        with closing(bounded_map(executor, _parse_chunk, chunks, window)) as results:
+            for headers in results:
+                for header in headers:
+                    if header['de']:
+                        header['de']['hash'] = hashlib.sha1(header['de']['hash'])
+                    yield header
@@ -1,11 +1,14 @@
 """MGZ parsing utilities."""
 
+import functools
 import logging
 import re
 import struct
 import zlib
+from collections import deque
 from enum import Enum
-from io import BytesIO
+from io import SEEK_END, BytesIO
+from itertools import islice
 
 try:
     import construct.core
@@ -17,6 +20,19 @@ except ImportError:
     Subconstruct = object
     Tunnel = object
 
+try:
+    import deflate as libdeflate
+except ImportError:
+    libdeflate = None
+
+try:
+    from isal import isal_zlib as fast_zlib
+except ImportError:
+    try:
+        from zlib_ng import zlib_ng as fast_zlib
+    except ImportError:
+        fast_zlib = zlib
+
 from mgz import const
 
 
@@ -26,6 +42,14 @@ LOGGER = logging.getLogger(__name__)
 SEARCH_MAX_BYTES = 3000
 POSTGAME_LENGTH = 2096
 LOOKAHEAD = 9
+# libdeflate output buffer, as a multiple of the compressed size; replay
+# headers inflate to roughly 7-15x
+INFLATE_RATIO = 32
+# Errors raised by either inflater; the set collapses them when fast_zlib is zlib
+INFLATE_ERRORS = tuple({zlib.error, fast_zlib.error})
+# Hex dump lookup tables: two hex digits per byte value, and '.' for unprintables
+HEX_BYTES = tuple(b'%02x' % b for b in range(256))
+PRINTABLE = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
 
 
 class Version(Enum):
@@ -75,6 +99,23 @@ class ZlibCompressed(Tunnel):
         return zlib.decompress(data, wbits=-15)
 
 
+def raw_inflate(data):
+    """Decompress a header-less zlib stream.
+
+    Tries libdeflate (the `deflate` package) first, then isal or zlib-ng,
+    and finally stdlib zlib. libdeflate needs the output size up front and
+    reports a too-small buffer and bad data with the same DeflateError, so
+    it gets one attempt with a generous buffer; on failure the stream goes
+    to zlib, which either inflates it or raises the real error.
+    """
+    if libdeflate is not None:
+        try:
+            return libdeflate.deflate_decompress(data, max(INFLATE_RATIO * len(data), 1 << 16))
+        except libdeflate.DeflateError:
+            pass
+    return fast_zlib.decompress(data, wbits=-15)
+
+
 def get_save_version(old_version, new_version):
     """Get the save version."""
     if old_version == -1:
@@ -84,8 +125,12 @@ def get_save_version(old_version, new_version):
     return old_version
 
 
+@functools.lru_cache(maxsize=128)
 def get_version(game_version, save_version, log_version):
-    """Get version based on version fields."""
+    """Get version based on version fields.
+
+    Only a handful of field combinations exist, so results are cached.
+    """
     if game_version == 'VER 9.3':
         return Version.AOK
     if game_version == 'VER 9.4':
@@ -331,5 +376,83 @@ def unpack(fmt, data, shorten=True):
     return output
 
 
+def hexdump(data, base_offset=0, mark=None):
+    """Return a hex dump string, optionally marking a specific offset with >>."""
+    lines = []
+    for i in range(0, len(data), 16):
+        chunk = data[i:i+16]
+        offset = base_offset + i
+        marker = '>>' if mark is not None and offset <= mark < offset + 16 else '  '
+        hex_part = b' '.join(map(HEX_BYTES.__getitem__, chunk)).decode('ascii')
+        asc_part = chunk.translate(PRINTABLE).decode('ascii')
+        lines.append(f"{marker} {offset:08x}  {hex_part:<47}  {asc_part}")
+    return '\n'.join(lines)
+
+
+def read_exact(data, length):
+    """Read `length` bytes, raising struct.error like unpack() when short."""
+    value = data.read(length)
+    if len(value) != length:
+        raise struct.error(f"unpack requires a buffer of {length} bytes")
+    return value
+
+
+def skip_bytes(data, length):
+    """Skip `length` bytes; a negative length skips everything left, as read() would."""
+    if length < 0:
+        data.seek(0, SEEK_END)
+    else:
+        data.seek(length, 1)
+
+
+def find_ahead(data, needle):
+    """Return the offset of `needle` past the stream position, or -1.
+
+    Same as data.read().find(needle) on a BytesIO, but searches the shared
+    buffer from getvalue() instead of copying the rest of the header, and
+    leaves the position alone.
+    """
+    pos = data.tell()
+    found = data.getvalue().find(needle, pos)
+    return found - pos if found >= 0 else -1
+
+
+def find_wildcard(data, prefix, suffix, start=0):
+    """Find `prefix`, any one byte, then `suffix`; return the end offset or -1.
+
+    Equivalent to re.search(prefix + b'.' + suffix, data, re.DOTALL).end(),
+    but both halves are plain bytes.find/startswith calls, anchored on the
+    rarer suffix.
+    """
+    skip = len(prefix) + 1
+    i = data.find(suffix, start + skip)
+    while i >= 0:
+        if data.startswith(prefix, i - skip):
+            return i + len(suffix)
+        i = data.find(suffix, i + 1)
+    return -1
+
+
+def bounded_map(executor, fn, iterable, window):
+    """Yield executor.map(fn, iterable) results, keeping `window` calls in flight.
+
+    `iterable` is only consumed as results are taken, and calls that have
+    not started are cancelled when the generator is closed.
+    """
+    iterable = iter(iterable)
+    pending = deque(executor.submit(fn, item) for item in islice(iterable, window))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            # Refill the window before yielding, so the workers stay busy
+            for item in islice(iterable, 1):
+                pending.append(executor.submit(fn, item))
+            yield result
+    finally:
+        # Executor.shutdown(cancel_futures=True) would need Python 3.9
+        for future in pending:
+            future.cancel()
+
+
 def as_hex(d):
     return " ".join(["{:02x}".format(x) for x in d])
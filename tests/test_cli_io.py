@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+from mgz.cli import _io
+
+DATA = b'mgz' * 100000
+
+
+class TestZipMembers(unittest.TestCase):
+
+    def archive(self, compression, data=DATA):
+        handle, path = tempfile.mkstemp(suffix='.zip')
+        os.close(handle)
+        self.addCleanup(os.unlink, path)
+        with zipfile.ZipFile(path, 'w', compression) as zf:
+            zf.writestr('match.aoe2record', data)
+        return path
+
+    def test_methods(self):
+        for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2):
+            path = self.archive(compression)
+            self.assertEqual(_io.open_mgz(path)[:], DATA)
+            stream, size = _io.open_mgz_stream(path)
+            with stream:
+                self.assertEqual((stream.read(), size), (DATA, len(DATA)))
+
+    def test_bad_crc(self):
+        path = self.archive(zipfile.ZIP_STORED)
+        with open(path, 'r+b') as handle:
+            handle.seek(100)
+            byte = handle.read(1)
+            handle.seek(100)
+            handle.write(bytes([byte[0] ^ 1]))
+        with self.assertRaises(zipfile.BadZipFile):
+            _io.open_mgz(path)
+
+    def test_empty_member(self):
+        stream, size = _io.open_mgz_stream(self.archive(zipfile.ZIP_DEFLATED, b''))
+        with stream:
+            self.assertEqual((stream.read(), size), (b'', 0))
@@ -1,5 +1,5 @@
 import unittest
-from mgz.fast.header import parse
+from mgz.fast.header import parse, parse_many
 from mgz.util import Version
 
 class TestFastUserPatch15(unittest.TestCase):
@@ -88,3 +88,18 @@ class TestFastHD(unittest.TestCase):
 
     def test_map(self):
         self.assertEqual(self.data['scenario']['map_id'], 0)
+
+
+class TestFastParseMany(unittest.TestCase):
+
+    def test_matches_parse(self):
+        paths = ['tests/recs/small.mgz', 'tests/recs/de-13.34.aoe2record']
+        with open(paths[1], 'rb') as handle:
+            sources = [paths[0], handle.read()]
+        results = list(parse_many(sources, workers=2))
+        for path, result in zip(paths, results):
+            with open(path, 'rb') as handle:
+                expected = parse(handle)
+            if expected['de']:
+                self.assertEqual(result['de'].pop('hash').digest(), expected['de'].pop('hash').digest())
+            self.assertEqual(result, expected)
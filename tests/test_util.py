@@ -0,0 +1,82 @@
+import threading
+import unittest
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+from mgz import util
+
+
+def deflate_raw(data):
+    compressor = zlib.compressobj(wbits=-15)
+    return compressor.compress(data) + compressor.flush()
+
+
+class DeflateError(Exception):
+    pass
+
+
+class TestBoundedMap(unittest.TestCase):
+
+    def test_ordered_and_lazy(self):
+        taken = []
+
+        def source():
+            for i in range(10):
+                taken.append(i)
+                yield i
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = util.bounded_map(executor, lambda x: x * x, source(), 3)
+            self.assertEqual(next(results), 0)
+            self.assertEqual(len(taken), 4)
+            self.assertEqual(list(results), [x * x for x in range(1, 10)])
+
+    def test_close_cancels_pending(self):
+        release = threading.Event()
+        calls = []
+
+        def work(x):
+            calls.append(x)
+            release.wait(5)
+            return x
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = util.bounded_map(executor, work, range(10), 4)
+            release.set()
+            self.assertEqual(next(results), 0)
+            results.close()
+        self.assertLess(len(calls), 10)
+
+
+class TestRawInflate(unittest.TestCase):
+
+    def stub(self, side_effect):
+        decompress = mock.Mock(side_effect=side_effect)
+        module = SimpleNamespace(DeflateError=DeflateError, deflate_decompress=decompress)
+        return mock.patch.object(util, 'libdeflate', module), decompress
+
+    def test_libdeflate(self):
+        patch, decompress = self.stub([b'inflated'])
+        with patch:
+            self.assertEqual(util.raw_inflate(b'data'), b'inflated')
+        decompress.assert_called_once_with(b'data', 1 << 16)
+
+    def test_buffer_too_small_falls_back(self):
+        data = b'mgz' * 100000
+        patch, decompress = self.stub(DeflateError('Decompression failed'))
+        with patch:
+            self.assertEqual(util.raw_inflate(deflate_raw(data)), data)
+        decompress.assert_called_once()
+
+    def test_bad_data_raises_once(self):
+        patch, decompress = self.stub(DeflateError('Decompression failed'))
+        with patch, self.assertRaises(util.INFLATE_ERRORS):
+            util.raw_inflate(b'\xff' * 64)
+        decompress.assert_called_once()
+
+    def test_memory_error_propagates(self):
+        patch, _ = self.stub(MemoryError)
+        with patch, self.assertRaises(MemoryError):
+            util.raw_inflate(deflate_raw(b'mgz'))